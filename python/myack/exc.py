@@ -1,3 +1,4 @@
+import sys
 import typing as t
 
 from .serializer import Serializable
@@ -14,32 +15,40 @@ class BaseExc(Exception, Serializable):
 
     def __init_subclass__(cls, *, code: str) -> None:
         try:
-            cls.code = f"{cls.code}.{code}"
+            cls.code = sys.intern(f"{cls.code}.{code}")
         except AttributeError:
-            cls.code = code
-        assert (
-            cls.code not in BaseExc.registry
-        ), f"Code '{cls.code}' of {cls} conflicts with {BaseExc.registry[cls.code]}"
+            cls.code = sys.intern(code)
+        if cls.code in BaseExc.registry:
+            raise TypeError(
+                f"Code '{cls.code}' of {cls} conflicts with "
+                f"{BaseExc.registry[cls.code]}"
+            )
         BaseExc.registry[cls.code] = cls
 
     @classmethod
     def dispatch(cls, code: str, message: str = None, **data) -> "BaseExc":
-        try:
-            return BaseExc.registry[code](message, **data)
-        except KeyError:
+        exc_class = BaseExc.registry.get(code)
+        if exc_class is None:
             return UndefinedExc(
                 original={"code": code, "message": message, "data": data}
             )
+        return exc_class(message, **data)
 
     def __init__(self, message: str = None, **data) -> None:
         self.message = message or self.message
         self.data = data
-        assert self.message is not None, "Empty exception message"
+        if self.message is None:
+            raise TypeError("Empty exception message")
         super().__init__(self.code, self.message, self.data)
 
     def __eq__(self, other: t.Any) -> bool:
         return type(self) is type(other) and self.args == other.args
 
+    def __hash__(self) -> int:
+        # Data is mutable and may be unhashable, so it is left out,
+        # equal exceptions still have equal hashes
+        return hash((type(self), self.message))
+
     def dump(self) -> t.Dict[str, t.Any]:
         return {"code": self.code, "message": self.message, "data": self.data}
 
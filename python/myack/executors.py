@@ -5,29 +5,46 @@ from functools import partial
 from aioconductor import Component
 
 
+# Executor class or function, which accepts executor options
+ExecutorFactory = t.Callable[..., futures.Executor]
+
+
 class Executor(Component):
 
-    executor_class: t.ClassVar[t.Type[futures.Executor]]
+    executor_class: t.ClassVar[ExecutorFactory]
+    # Key of config branch with executor options, like ``max_workers``
+    config_key: t.ClassVar[t.Optional[str]] = None
     instance: futures.Executor
 
     async def on_setup(self) -> None:
-        self.instance = self.executor_class()
+        options: t.Dict[str, t.Any] = {}
+        if self.config_key is not None:
+            max_workers = self.config.get(f"{self.config_key}.max_workers")
+            if max_workers is not None:
+                options["max_workers"] = max_workers
+        self.instance = self.executor_class(**options)
+        # Warm the pool up, so that the first call does not pay for start
+        await self.loop.run_in_executor(self.instance, int)
 
     async def on_shutdown(self) -> None:
         self.instance.shutdown()
         del self.instance
 
     async def run(self, func: t.Callable, *agrs, **kw) -> t.Any:
-        return await self.loop.run_in_executor(
-            executor=self.instance, func=partial(func, *agrs, **kw)
-        )
+        if kw:
+            # Executor does not accept keyword arguments
+            func = partial(func, *agrs, **kw)
+            agrs = ()
+        return await self.loop.run_in_executor(self.instance, func, *agrs)
 
 
 class IOExecutor(Executor):
-    executor_class: t.ClassVar[t.Type[futures.Executor]] = futures.ThreadPoolExecutor
+    executor_class: t.ClassVar[ExecutorFactory] = futures.ThreadPoolExecutor
+    config_key: t.ClassVar[t.Optional[str]] = "executors.io"
     instance: futures.ThreadPoolExecutor
 
 
 class CPUExecutor(Executor):
-    executor_class: t.ClassVar[t.Type[futures.Executor]] = futures.ProcessPoolExecutor
+    executor_class: t.ClassVar[ExecutorFactory] = futures.ProcessPoolExecutor
+    config_key: t.ClassVar[t.Optional[str]] = "executors.cpu"
     instance: futures.ProcessPoolExecutor
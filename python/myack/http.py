@@ -34,30 +34,48 @@ class RouteTable(Component):
 
     prefix: t.ClassVar[str] = ""
 
+    # Names of routes and nested route tables, sorted like ``dir()`` does
+    _route_names: t.ClassVar[t.Tuple[str, ...]] = ()
+    # Names of middlewares, sorted by order
+    _middleware_names: t.ClassVar[t.Tuple[str, ...]] = ()
+
     def __init_subclass__(cls, *, prefix: str = "", **kw) -> None:
         super().__init_subclass__(**kw)
         cls.prefix = prefix
 
-    def iter_routes(self, prefix: str = "") -> t.Iterator[web.RouteDef]:
-        prefix = prefix.rstrip("/")
-        for name in dir(self):
+        routes = []
+        middlewares = []
+        for name in dir(cls):
             if name.startswith("_"):
                 continue
+            attr: t.Any = getattr(cls, name, None)
+            if hasattr(attr, "http_route_info"):
+                routes.append(name)
+            elif hasattr(attr, "http_middleware_info"):
+                middlewares.append((attr.http_middleware_info["order"], name))
+        routes.extend(
+            name
+            for name, component in cls.__depends_on__.items()
+            if not name.startswith("_") and issubclass(component, RouteTable)
+        )
+        cls._route_names = tuple(sorted(routes))
+        middlewares.sort(key=lambda m: m[0])
+        cls._middleware_names = tuple(name for _, name in middlewares)
+
+    def iter_routes(self, prefix: str = "") -> t.Iterator[web.RouteDef]:
+        prefix = prefix.rstrip("/")
+        for name in self._route_names:
             attr = getattr(self, name)
             if isinstance(attr, RouteTable):
                 yield from attr.iter_routes(f"{prefix}/{attr.prefix.lstrip('/')}")
             else:
-                try:
-                    info = attr.http_route_info
-                except AttributeError:
-                    pass
-                else:
-                    yield web.RouteDef(
-                        method=info["method"],
-                        path=f"{prefix}/{info['path'].lstrip('/')}",
-                        handler=attr,
-                        kwargs=info["kwargs"],
-                    )
+                info = attr.http_route_info
+                yield web.RouteDef(
+                    method=info["method"],
+                    path=f"{prefix}/{info['path'].lstrip('/')}",
+                    handler=attr,
+                    kwargs=info["kwargs"],
+                )
 
 
 class Application(RouteTable):
@@ -65,18 +83,13 @@ class Application(RouteTable):
     _instance: web.Application
 
     async def on_setup(self) -> None:
-        middlewares = []
+        middlewares = [getattr(self, name) for name in self._middleware_names]
         applications: t.List["Application"] = []
-
-        attrs = (getattr(self, name) for name in dir(self) if not name.startswith("_"))
-        for attr in attrs:
-            if hasattr(attr, "http_middleware_info"):
-                middlewares.append(attr)
-            elif isinstance(attr, Application):
+        for name in self._route_names:
+            attr = getattr(self, name)
+            if isinstance(attr, Application):
                 applications.append(attr)
 
-        middlewares.sort(key=lambda m: m.http_middleware_info["order"])
-
         self._instance = web.Application(
             middlewares=middlewares,
             client_max_size=self.config.get("http.client_max_size", 1024 ** 2),
@@ -127,7 +140,9 @@ class Server(Application):
         await super().on_shutdown()
 
     def get_client(self) -> "Client":
-        if self._client is None:
+        # Client is shared to reuse its connection pool,
+        # it is only recreated once closed
+        if self._client is None or self._client.closed:
             self._client = Client(
                 self.config["http.host"], self.config["http.port"], loop=self.loop
             )
@@ -141,17 +156,19 @@ with warnings.catch_warnings():
 
         app_host: str
         app_port: int
+        app_base_url: str
 
         def __init__(self, host: str, port: int, **kw) -> None:
             self.app_host = host
             self.app_port = port
+            self.app_base_url = str(URL.build(scheme="http", host=host, port=port))
             super().__init__(**kw)
 
         def app_url(self, url: t.Union[str, URL]) -> t.Union[str, URL]:
             if isinstance(url, str) and "://" not in url:
-                return URL.build(
-                    scheme="http", host=self.app_host, port=self.app_port, path=url
-                )
+                if not url.startswith("/"):
+                    url = "/" + url
+                return self.app_base_url + url
             return url
 
         def _request(self, method: str, str_or_url: t.Union[str, URL], **kw):
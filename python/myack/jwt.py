@@ -1,14 +1,13 @@
 import hmac
 import hashlib
-import base64
 import binascii
 import random
+from copy import deepcopy
 import typing as t
 from abc import ABC, abstractmethod
 
 import validx
 from aioconductor import Component
-from cached_property import cached_property
 
 from .exc import BaseError
 from .timer import Timer
@@ -17,6 +16,10 @@ from .serializer import Serializer
 
 TypeTokenEncoder = t.TypeVar("TypeTokenEncoder", bound=t.Type["TokenEncoder"])
 
+# Translation tables, which XOR each byte with HMAC inner/outer pad
+_HMAC_IPAD = bytes(b ^ 0x36 for b in range(256))
+_HMAC_OPAD = bytes(b ^ 0x5C for b in range(256))
+
 
 class JWT(Component):
     algorithms: t.ClassVar[t.Dict[str, t.Type["TokenEncoder"]]] = {}
@@ -65,6 +68,17 @@ class TokenEncoder(ABC):
     ttl: int
     max_ttl: int
 
+    header_schema: validx.Validator
+    payload_schema: validx.Validator
+
+    _default_header: t.Dict[str, t.Any]
+    _default_header_segment: bytes
+
+    # Tokens with verified signatures mapped to their header and payload,
+    # claims depend on time, so they are still verified on each decode
+    _verified: t.Dict[bytes, t.Tuple[t.Dict[str, t.Any], t.Dict[str, t.Any]]]
+    _verified_limit: t.ClassVar[int] = 1024
+
     def __init__(
         self,
         serializer: Serializer,
@@ -80,6 +94,24 @@ class TokenEncoder(ABC):
         self.sub = sub
         self.ttl = ttl
         self.max_ttl = max(max_ttl, ttl)
+        self.header_schema = validx.Dict(
+            {"typ": validx.Const("JWT"), "alg": validx.Const(self.alg)},
+            extra=(validx.Str(), validx.Any()),
+        )
+        self.payload_schema = validx.Dict(
+            {
+                "sub": validx.Const(self.sub),
+                "iat": validx.Float(min=0),
+                "exp": validx.Float(min=0),
+            },
+            optional=None if self.ttl else ("exp",),
+            extra=(validx.Str(), validx.Any()),
+        )
+        self._default_header = {"typ": "JWT", "alg": self.alg}
+        self._default_header_segment = b64encode(
+            self.serializer.dumpb(self._default_header)
+        )
+        self._verified = {}
 
     def __repr__(self):
         return f"<{self.__class__.__name__}({self.sub})>"
@@ -89,28 +121,54 @@ class TokenEncoder(ABC):
         payload: t.Dict[str, t.Any],
         header: t.Dict[str, t.Any] = None,
     ) -> bytes:
-        header = dict(header or {}, typ="JWT", alg=self.alg)
+        if header is None:
+            header = self._default_header
+            header_segment = self._default_header_segment
+        else:
+            header = dict(header, typ="JWT", alg=self.alg)
+            header_segment = b64encode(self.serializer.dumpb(header))
         payload = payload.copy()
         payload["sub"] = self.sub
-        payload["iat"] = self.timer.tsnow()
+        payload["iat"] = now = self.timer.tsnow()
         if self.ttl:
-            payload.setdefault("exp", payload["iat"] + self.ttl)
-        segments = [
-            b64encode(self.serializer.dumpb(header)),
-            b64encode(self.serializer.dumpb(payload)),
-        ]
+            payload.setdefault("exp", now + self.ttl)
+        segments = [header_segment, b64encode(self.serializer.dumpb(payload))]
         signing_input = b".".join(segments)
         segments.append(b64encode(self.sign(payload, header, signing_input)))
         return b".".join(segments)
 
     def decode(self, token: t.Union[bytes, str]) -> t.Dict[str, t.Any]:
-        try:
-            if isinstance(token, str):
+        if isinstance(token, str):
+            try:
                 token = token.encode("ascii")
+            except UnicodeEncodeError:
+                raise JWTInvalid(sub=self.sub)
 
-            signing_input, signature_raw = token.rsplit(b".", 1)
-            header_raw, payload_raw = signing_input.split(b".")
+        verified = self._verified.get(token)
+        if verified is None:
+            verified = self.verify(token)
+            if len(self._verified) >= self._verified_limit:
+                self._verified.clear()
+            self._verified[token] = verified
+        header, payload = verified
 
+        self.verify_claims(payload, header)
+        # Cached payload is copied deeply, so that nested claims
+        # are not affected by caller
+        return deepcopy(payload)
+
+    def verify(self, token: bytes) -> t.Tuple[t.Dict[str, t.Any], t.Dict[str, t.Any]]:
+        # Separators are located by find, instead of splitting token twice
+        i = token.find(b".")
+        j = token.find(b".", i + 1)
+        if i < 0 or j < 0 or token.find(b".", j + 1) >= 0:
+            raise JWTInvalid(sub=self.sub)
+        signing_input = token[:j]
+        header_raw = token[:i]
+        payload_raw = token[i + 1 : j]
+        signature_raw = token[j + 1 :]
+
+        try:
             header = self.serializer.loadb(b64decode(header_raw))
             payload = self.serializer.loadb(b64decode(payload_raw))
             signature = b64decode(signature_raw)
@@ -126,28 +184,7 @@ class TokenEncoder(ABC):
         effective_signature = self.sign(payload, header, signing_input)
         if not hmac.compare_digest(signature, effective_signature):
             raise JWTInvalid(sub=self.sub)
-
-        self.verify_claims(payload, header)
-        return payload
-
-    @cached_property
-    def header_schema(self):
-        return validx.Dict(
-            {"typ": validx.Const("JWT"), "alg": validx.Const(self.alg)},
-            extra=(validx.Str(), validx.Any()),
-        )
-
-    @cached_property
-    def payload_schema(self):
-        return validx.Dict(
-            {
-                "sub": validx.Const(self.sub),
-                "iat": validx.Float(min=0),
-                "exp": validx.Float(min=0),
-            },
-            optional=None if self.ttl else ("exp",),
-            extra=(validx.Str(), validx.Any()),
-        )
+        return header, payload
 
     def verify_claims(
         self,
@@ -171,6 +208,15 @@ class TokenEncoder(ABC):
         """Generate JWT signature"""
 
 
+class Signer(t.NamedTuple):
+    period: t.Optional[int]
+    key: bytes
+    # Hash objects fed with inner and outer HMAC pads,
+    # they are copied on each signing
+    inner: t.Any
+    outer: t.Any
+
+
 class HSEncoder(TokenEncoder):
 
     keylen: t.ClassVar[int]
@@ -181,6 +227,8 @@ class HSEncoder(TokenEncoder):
     rot_period: int
 
     _random: t.Optional[random.Random]
+    _key_int: int
+    _signers: t.Tuple[Signer, ...]
 
     def __init__(
         self,
@@ -196,22 +244,48 @@ class HSEncoder(TokenEncoder):
     ) -> None:
         super().__init__(serializer, timer, sub=sub, ttl=ttl, max_ttl=max_ttl)
         self.key = binascii.unhexlify(key)
+        self._key_int = int.from_bytes(self.key, "big")
         self.ttl = ttl
         self.rot_salt = rot_salt
         self.rot_period = rot_period
         self._random = None if self.rot_period <= 0 else random.Random()
-        assert (
-            len(self.key) >= self.keylen
-        ), f"Key of {self} should be at least {self.keylen} bytes"
+        self._signers = (self.make_signer(None, self.key),) * 2
+        if len(self.key) < self.keylen:
+            raise ValueError(f"Key of {self} should be at least {self.keylen} bytes")
+
+    def make_signer(self, period: t.Optional[int], key: bytes) -> Signer:
+        # See RFC 2104
+        block_size = self.algorithm().block_size
+        padded_key = self.algorithm(key).digest() if len(key) > block_size else key
+        padded_key = padded_key.ljust(block_size, b"\0")
+        return Signer(
+            period,
+            key,
+            self.algorithm(padded_key.translate(_HMAC_IPAD)),
+            self.algorithm(padded_key.translate(_HMAC_OPAD)),
+        )
 
-    def get_effective_key(self, ts: float) -> bytes:
+    def get_signer(self, ts: float) -> Signer:
         if self._random is None:
-            return self.key
-        self._random.seed(self.rot_salt + int(ts) // self.rot_period, version=2)
-        result = bytearray(len(self.key))
-        for i, b in enumerate(self.key):
-            result[i] = b ^ self._random.getrandbits(8)
-        return result
+            return self._signers[0]
+        period = int(ts) // self.rot_period
+        for signer in self._signers:
+            if signer.period == period:
+                return signer
+        self._random.seed(self.rot_salt + period, version=2)
+        size = len(self.key)
+        # Each byte of the mask is the top byte of a 32-bit random word,
+        # same as ``getrandbits(8)`` per byte, but generated in one call
+        words = self._random.getrandbits(size * 32).to_bytes(size * 4, "little")
+        mask = int.from_bytes(words[3::4], "big")
+        signer = self.make_signer(period, (self._key_int ^ mask).to_bytes(size, "big"))
+        # Keep the previous period too, tokens issued right before rotation
+        # are still being decoded for a while.
+        self._signers = (signer, self._signers[0])
+        return signer
+
+    def get_effective_key(self, ts: float) -> bytes:
+        return self.get_signer(ts).key
 
     def sign(
         self,
@@ -219,8 +293,12 @@ class HSEncoder(TokenEncoder):
         header: t.Dict[str, t.Any],
         signing_input: bytes,
     ) -> bytes:
-        effective_key = self.get_effective_key(payload["iat"])
-        return hmac.new(effective_key, signing_input, self.algorithm).digest()
+        signer = self.get_signer(payload["iat"])
+        inner = signer.inner.copy()
+        inner.update(signing_input)
+        outer = signer.outer.copy()
+        outer.update(inner.digest())
+        return outer.digest()
 
 
 @JWT.add_algorithm
@@ -256,10 +334,22 @@ class JWTExpired(JWTError, code="expired"):
     message: str = "Expired JWT"
 
 
+# URL-safe alphabet is translated directly, since ``base64.urlsafe_*``
+# functions add a couple of Python-level calls on top of ``binascii``
+_B64_URLSAFE_ENCODE = bytes.maketrans(b"+/", b"-_")
+_B64_URLSAFE_DECODE = bytes.maketrans(b"-_", b"+/")
+
+
 def b64encode(data: bytes) -> bytes:
-    return base64.urlsafe_b64encode(data).rstrip(b"=")
+    return (
+        binascii.b2a_base64(data, newline=False)
+        .translate(_B64_URLSAFE_ENCODE)
+        .rstrip(b"=")
+    )
 
 
 def b64decode(data: bytes) -> bytes:
-    data += b"=" * (4 - (len(data) % 4))
-    return base64.urlsafe_b64decode(data)
+    padding = -len(data) % 4
+    if padding:
+        data += b"=" * padding
+    return binascii.a2b_base64(data.translate(_B64_URLSAFE_DECODE))
@@ -1,8 +1,9 @@
 import asyncio
+import sys
 import typing as t
 from datetime import date
 from functools import partial
-from inspect import cleandoc
+from inspect import Signature, cleandoc, signature
 
 import validx
 from aioconductor import Component
@@ -48,28 +49,56 @@ def middleware(order: int) -> Decorator:
     return decorator
 
 
+def apply_middlewares(handler: Handler, middlewares: t.Sequence[Middleware]) -> Handler:
+    for middleware in reversed(middlewares):
+        handler = t.cast(Handler, partial(middleware, handler))
+    return handler
+
+
 class MethodDef(t.NamedTuple):
     name: str
     handler: t.Callable[..., t.Awaitable[t.Any]]
     namespaces: t.Tuple["Namespace", ...]
+    # Handler wrapped by middlewares of dispatcher and namespaces,
+    # it is built once on setup
+    composed: t.Optional[Handler] = None
+    signature: t.Optional[Signature] = None
 
 
 class Namespace(Component):
 
     enabled: bool = True
 
+    # Names of handlers and nested namespaces, sorted like ``dir()`` does
+    _method_names: t.ClassVar[t.Tuple[str, ...]] = ()
+    # Names of middlewares, sorted by order
+    _middleware_names: t.ClassVar[t.Tuple[str, ...]] = ()
+
     _middlewares: t.List[Middleware]
 
-    async def on_setup(self) -> None:
-        self._middlewares = []
-        attrs = (getattr(self, name) for name in dir(self) if not name.startswith("_"))
-        for attr in attrs:
-            if hasattr(attr, "rpc_middleware_info"):
-                self._middlewares.append(attr)
-
-        self._middlewares.sort(
-            key=lambda m: m.rpc_middleware_info["order"]  # type: ignore
+    def __init_subclass__(cls, **kw) -> None:
+        super().__init_subclass__(**kw)
+        methods = []
+        middlewares = []
+        for name in dir(cls):
+            if name.startswith("_"):
+                continue
+            attr: t.Any = getattr(cls, name, None)
+            if hasattr(attr, "rpc_handler_info"):
+                methods.append(name)
+            elif hasattr(attr, "rpc_middleware_info"):
+                middlewares.append((attr.rpc_middleware_info["order"], name))
+        methods.extend(
+            name
+            for name, component in cls.__depends_on__.items()
+            if not name.startswith("_") and issubclass(component, Namespace)
         )
+        cls._method_names = tuple(sorted(methods))
+        middlewares.sort(key=lambda m: m[0])
+        cls._middleware_names = tuple(name for _, name in middlewares)
+
+    async def on_setup(self) -> None:
+        self._middlewares = [getattr(self, name) for name in self._middleware_names]
 
     async def on_shutdown(self) -> None:
         del self._middlewares
@@ -79,12 +108,8 @@ class Namespace(Component):
         namespaces: t.Tuple["Namespace", ...] = (),
         prefix: str = "",
     ) -> t.Iterator[MethodDef]:
-        attrs = (
-            (name, getattr(self, name))
-            for name in dir(self)
-            if not name.startswith("_")
-        )
-        for name, attr in attrs:
+        for name in self._method_names:
+            attr = getattr(self, name)
             if hasattr(attr, "rpc_handler_info"):
                 yield MethodDef(f"{prefix}{name}", attr, namespaces)
             elif (
@@ -101,7 +126,14 @@ class Dispatcher(Namespace):
 
     async def on_setup(self) -> None:
         await super().on_setup()
-        self._methods = {md.name: md for md in self.iter_methods()}
+        # Method names are interned, so that lookup of names coming
+        # from interned strings short-circuits on identity check
+        self._methods = {
+            sys.intern(md.name): md._replace(
+                composed=self.compose(md), signature=signature(md.handler)
+            )
+            for md in self.iter_methods()
+        }
 
     async def on_shutdown(self) -> None:
         del self._methods
@@ -114,12 +146,12 @@ class Dispatcher(Namespace):
             raise RPCUndefinedMethod(
                 method=request.method, version=request.meta.get("version")
             )
+        return await self.call(md, request)
 
+    async def call(self, md: MethodDef, request: Request) -> Response:
         request.handler = md.handler
         request.handler_info = md.handler.rpc_handler_info  # type: ignore
-        request.middlewares.extend(self._middlewares)
-        for namespace in md.namespaces:
-            request.middlewares.extend(namespace._middlewares)
+        request.handler_signature = t.cast(Signature, md.signature)
 
         try:
             request.params = request.handler_info["schema"](request.params)
@@ -130,20 +162,28 @@ class Dispatcher(Namespace):
                 version=request.meta.get("version"),
             )
 
+        handler = t.cast(Handler, md.composed)
+        if request.middlewares:
+            handler = apply_middlewares(handler, request.middlewares)
+        return await handler(request)
+
+    def compose(self, md: MethodDef) -> Handler:
+        method_handler = md.handler
+        shield = md.handler.rpc_handler_info["shield"]  # type: ignore
+        raises = md.handler.rpc_handler_info["raises"]  # type: ignore
+
         async def wrapper(request: Request) -> Response:
             try:
                 params = dict(request.params, **request.injections)
-                aw = request.handler(**params)  # type: ignore
-                if request.handler_info["shield"]:
+                aw = method_handler(**params)
+                if shield:
                     aw = asyncio.shield(aw, loop=self.loop)
                 result = await aw
                 return request.response(result=result)
             except asyncio.CancelledError:
                 raise
             except Exception as e:
-                if isinstance(e, request.handler_info["raises"]) and isinstance(
-                    e, BaseError
-                ):
+                if isinstance(e, raises) and isinstance(e, BaseError):
                     e.data.update(
                         method=request.method, version=request.meta.get("version")
                     )
@@ -155,11 +195,11 @@ class Dispatcher(Namespace):
                     method=request.method, version=request.meta.get("version")
                 )
 
-        handler: Handler = wrapper
-        for middleware in reversed(request.middlewares):
-            handler = t.cast(Handler, partial(middleware, handler))
+        middlewares = list(self._middlewares)
+        for namespace in md.namespaces:
+            middlewares.extend(namespace._middlewares)
 
-        return await handler(request)
+        return apply_middlewares(wrapper, middlewares)
 
     def format_schema_error(
         self,
@@ -170,6 +210,14 @@ class Dispatcher(Namespace):
     @handler(shield=False, builtin=True)
     async def list_methods(self) -> t.List[t.Dict[str, t.Any]]:
         """List methods provided by API/Version"""
+        return self.make_method_list()
+
+    @handler(shield=False, builtin=True)
+    async def list_exceptions(self) -> t.List[t.Dict[str, t.Any]]:
+        """List exceptions defined within API"""
+        return self.make_exception_list()
+
+    def make_method_list(self) -> t.List[t.Dict[str, t.Any]]:
         result = []
         for method_def in self._methods.values():
             info = dict(
@@ -187,9 +235,7 @@ class Dispatcher(Namespace):
         result.sort(key=lambda e: e["name"])
         return result
 
-    @handler(shield=False, builtin=True)
-    async def list_exceptions(self) -> t.List[t.Dict[str, t.Any]]:
-        """List exceptions defined within API"""
+    def make_exception_list(self) -> t.List[t.Dict[str, t.Any]]:
         result = []
         for code, exc_class in BaseExc.registry.items():
             result.append(
@@ -238,17 +284,35 @@ class APIVersion(Dispatcher):
 class API(Dispatcher):
 
     _versions: t.Dict[int, t.Dict[int, APIVersion]]
+    # Methods of each version, wrapped by API middlewares,
+    # versions overriding ``dispatch()`` are not included
+    _version_methods: t.Dict[Version, t.Dict[str, MethodDef]]
+    _version_list: t.List[t.Dict[str, t.Any]]
 
     async def on_setup(self) -> None:
         await super().on_setup()
         versions = [v for v in self.depends_on if isinstance(v, APIVersion)]
         versions.sort(key=lambda v: v.version)
         self._versions = {}
+        self._version_methods = {}
         for v in versions:
             majors = self._versions.setdefault(v.version.major, {})
             majors[v.version.minor] = v
+            if type(v).dispatch is not Dispatcher.dispatch:
+                continue
+            self._version_methods[v.version] = {
+                name: md._replace(
+                    composed=apply_middlewares(
+                        t.cast(Handler, md.composed), self._middlewares
+                    )
+                )
+                for name, md in v._methods.items()
+            }
+        self._version_list = self.make_version_list()
 
     async def on_shutdown(self) -> None:
+        del self._version_list
+        del self._version_methods
         del self._versions
         await super().on_shutdown()
 
@@ -275,12 +339,22 @@ class API(Dispatcher):
                 raise RPCUnsupportedVersion(version=request.meta["version"])
 
         request.meta["version"] = context.version
-        request.middlewares.extend(self._middlewares)
-        return await context.dispatch(request)
+        methods = self._version_methods.get(context.version)
+        if methods is None:
+            request.middlewares.extend(self._middlewares)
+            return await context.dispatch(request)
+        try:
+            md = methods[request.method]
+        except KeyError:
+            raise RPCUndefinedMethod(method=request.method, version=context.version)
+        return await context.call(md, request)
 
     @handler(shield=False, builtin=True)
     async def list_versions(self) -> t.List[t.Dict[str, t.Any]]:
         """List supported API versions"""
+        return [dict(info) for info in self._version_list]
+
+    def make_version_list(self) -> t.List[t.Dict[str, t.Any]]:
         result = []
         for majors in self._versions.values():
             for minor in majors.values():
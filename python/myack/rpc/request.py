@@ -3,7 +3,6 @@ import typing as t
 
 import validx
 from multidict import MultiMapping
-from cached_property import cached_property
 
 from ..exc import BaseError, BaseWarning
 from .exc import RPCInvalidRequest
@@ -17,6 +16,21 @@ TransportInfo = t.Union[MultiMapping[str], t.Mapping[str, str]]
 
 class Request:
 
+    # Instance dictionary is kept for custom attributes set by middlewares
+    __slots__ = (
+        "id",
+        "method",
+        "meta",
+        "params",
+        "transport_info",
+        "middlewares",
+        "injections",
+        "handler",
+        "handler_info",
+        "_handler_signature",
+        "__dict__",
+    )
+
     schema: t.ClassVar[validx.Validator] = validx.Dict(
         {
             "id": validx.Int(),
@@ -34,6 +48,13 @@ class Request:
         },
         defaults={"params": {}, "meta": {}},
     )
+    # Keys of payload, which can be loaded bypassing the schema
+    well_formed_keys: t.ClassVar[t.FrozenSet[str]] = frozenset(
+        ("id", "method", "params", "meta")
+    )
+    # Whether payload is validated on load, it can be disabled,
+    # when all peers are trusted to send valid requests
+    validate_incoming: t.ClassVar[bool] = True
 
     id: int
     method: str
@@ -46,6 +67,7 @@ class Request:
 
     handler: t.Optional[t.Callable[..., t.Awaitable[t.Any]]]
     handler_info: t.Dict[str, t.Any]
+    _handler_signature: t.Optional[inspect.Signature]
 
     def __init__(
         self,
@@ -66,26 +88,104 @@ class Request:
 
         self.handler = None
         self.handler_info = {}
+        self._handler_signature = None
 
     @classmethod
     def load(
         cls,
         payload: t.Dict[str, t.Any],
         transport_info: TransportInfo = None,
+        validate: bool = None,
     ) -> "Request":
+        if validate is None:
+            validate = cls.validate_incoming
+        if not validate and cls.is_trusted_shape(payload):
+            return cls.load_trusted(payload, transport_info)
+        if cls.schema is Request.schema and cls.is_well_formed(payload):
+            meta = payload.get("meta")
+            params = payload.get("params")
+            return cls(
+                id=payload["id"],
+                method=payload["method"],
+                meta=None if meta is None else dict(meta),
+                params=None if params is None else dict(params),
+                transport_info=transport_info,
+            )
         try:
             return cls(**cls.schema(payload), transport_info=transport_info)
         except validx.exc.ValidationError as e:
             raise RPCInvalidRequest(reason=cls.format_schema_error(e))
 
+    @classmethod
+    def load_trusted(
+        cls,
+        payload: t.Dict[str, t.Any],
+        transport_info: TransportInfo = None,
+    ) -> "Request":
+        """Load payload as is, skipping validation"""
+        meta = payload.get("meta")
+        if meta is not None and meta.get("version") is not None:
+            meta["version"] = tuple(meta["version"])
+        return cls(
+            id=payload["id"],
+            method=payload["method"],
+            meta=meta,
+            params=payload.get("params"),
+            transport_info=transport_info,
+        )
+
+    @classmethod
+    def is_trusted_shape(cls, payload: t.Any) -> bool:
+        """Check whether payload can be loaded as is, skipping validation"""
+        if not isinstance(payload, dict):
+            return False
+        if "id" not in payload or "method" not in payload:
+            return False
+        if not isinstance(payload.get("params", {}), dict):
+            return False
+        meta = payload.get("meta", {})
+        if not isinstance(meta, dict):
+            return False
+        version = meta.get("version")
+        return version is None or (
+            isinstance(version, (list, tuple)) and len(version) == 2
+        )
+
+    @classmethod
+    def is_well_formed(cls, payload: t.Any) -> bool:
+        """Check whether payload already matches the schema as is"""
+        if type(payload) is not dict or not cls.well_formed_keys.issuperset(payload):
+            return False
+        if type(payload.get("id")) is not int:
+            return False
+        # Strings are stripped by the schema, so they have to be stripped already
+        method = payload.get("method")
+        if type(method) is not str or method != method.strip():
+            return False
+        for key in ("params", "meta"):
+            value = payload.get(key, {})
+            if type(value) is not dict or not all(
+                type(k) is str and k == k.strip() for k in value
+            ):
+                return False
+        # Version has to be converted into tuple by the schema
+        return "version" not in payload.get("meta", {})
+
     @classmethod
     def format_schema_error(cls, error: validx.exc.ValidationError) -> t.Dict[str, str]:
         return dict(validx.exc.format_error(error))
 
-    @cached_property
+    @property
     def handler_signature(self) -> inspect.Signature:
+        """Signature of handler, which is precomputed by dispatcher"""
         assert self.handler is not None
-        return inspect.signature(self.handler)
+        if self._handler_signature is None:
+            return inspect.signature(self.handler)
+        return self._handler_signature
+
+    @handler_signature.setter
+    def handler_signature(self, value: inspect.Signature) -> None:
+        self._handler_signature = value
 
     def response(
         self,
@@ -6,6 +6,8 @@ from ..exc import BaseError, BaseWarning
 
 class Response(Serializable):
 
+    __slots__ = ("id", "meta", "result", "error", "warnings")
+
     id: t.Optional[int]
     meta: t.Dict[str, t.Any]
     result: t.Any
@@ -21,10 +23,10 @@ class Response(Serializable):
         warnings: t.List[BaseWarning] = None,
     ) -> None:
         self.id = id
-        self.meta = meta or {}
+        self.meta = meta if meta is not None else {}
         self.result = result
         self.error = error
-        self.warnings = warnings or []
+        self.warnings = warnings if warnings is not None else []
 
     def dump(self) -> t.Dict[str, t.Any]:
         return {
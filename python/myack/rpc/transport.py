@@ -2,6 +2,7 @@ import asyncio
 import sys
 import warnings
 import typing as t
+from itertools import count
 from random import randint
 
 from aiohttp import web
@@ -15,30 +16,95 @@ from .response import Response
 from .exc import RPCParseError, RPCInvalidRequest, RPCInternalError
 
 
+def copy_exception(exc: Exception) -> Exception:
+    """Copy exception, so that each raise of the copy has its own traceback"""
+    try:
+        result = type(exc).__new__(type(exc), *exc.args)
+    except Exception:  # pragma: no cover
+        return exc
+    result.args = exc.args
+    result.__dict__.update(exc.__dict__)
+    result.__cause__ = exc
+    return result
+
+
 class HTTPRoutes(RouteTable):
 
     api: API
     serializer: Serializer
 
+    # Skip validation of requests, which are sent by trusted peers
+    trust_peers: t.ClassVar[bool] = False
+
     _client: t.Optional["Client"]
+    # Draining of replaced clients, which may still have pending requests
+    _draining: t.Set[asyncio.Future]
 
-    def __init_subclass__(cls, *, api: t.Type[API], **kw) -> None:
+    # Serialized responses of errors, which are not bound to a request
+    _internal_error_body: bytes
+    _parse_error_bodies: t.Dict[str, bytes]
+    _parse_error_bodies_limit: t.ClassVar[int] = 64
+
+    def __init_subclass__(
+        cls, *, api: t.Type[API], trust_peers: bool = False, **kw
+    ) -> None:
         cls.__annotations__["api"] = api
+        cls.trust_peers = trust_peers
         super().__init_subclass__(**kw)
 
     async def on_setup(self) -> None:
         self._client = None
+        self._draining = set()
+        self._internal_error_body = self.serializer.dumpb(
+            Response(error=RPCInternalError())
+        )
+        self._parse_error_bodies = {}
 
     async def on_shutdown(self) -> None:
+        if self._client is not None:
+            await self._client.drain()
+        if self._draining:
+            await asyncio.wait(self._draining)
         del self._client
+        del self._draining
+        del self._internal_error_body
+        del self._parse_error_bodies
 
-    def get_client(self, http_client: HTTPClient, endpoint: str = None) -> "Client":
-        if self._client is None:
-            self._client = Client(
-                endpoint=endpoint or f"{self.prefix.rstrip('/')}/",
-                serializer=self.serializer,
-                http_client=http_client,
-            )
+    def get_parse_error_body(self, reason: str) -> bytes:
+        body = self._parse_error_bodies.get(reason)
+        if body is None:
+            if len(self._parse_error_bodies) >= self._parse_error_bodies_limit:
+                self._parse_error_bodies.clear()
+            body = self.serializer.dumpb(Response(error=RPCParseError(reason=reason)))
+            self._parse_error_bodies[reason] = body
+        return body
+
+    def get_client(
+        self,
+        http_client: HTTPClient,
+        endpoint: str = None,
+        coalesce_window: float = 0,
+    ) -> "Client":
+        if (
+            self._client is None
+            or self._client.http_client is not http_client
+            or self._client.coalesce_window != coalesce_window
+        ):
+            if self._client is not None:
+                drain = asyncio.ensure_future(self._client.drain(), loop=self.loop)
+                self._draining.add(drain)
+                drain.add_done_callback(self._draining.discard)
+            endpoint = endpoint or f"{self.prefix.rstrip('/')}/"
+            if coalesce_window:
+                self._client = BatchingClient(
+                    endpoint,
+                    self.serializer,
+                    http_client,
+                    coalesce_window,
+                    loop=self.loop,
+                )
+            else:
+                self._client = Client(endpoint, self.serializer, http_client)
         return self._client
 
     @route("GET", "/healthcheck")
@@ -62,34 +128,63 @@ class HTTPRoutes(RouteTable):
         json_request: bytes,
         http_headers: TransportInfo,
     ) -> bytes:
+        serializer = self.serializer
+
         # Parse request
         try:
-            raw_request = self.serializer.loadb(json_request)
+            raw_request = serializer.loadb(json_request)
         except (ValueError, TypeError) as e:
-            return self.serializer.dumpb(Response(error=RPCParseError(reason=str(e))))
+            return self.get_parse_error_body(str(e))
 
         # Handle request
         if isinstance(raw_request, list):
-            response = await asyncio.gather(
-                *(self.handle_raw(r, http_headers) for r in raw_request), loop=self.loop
-            )
+            # Methods are bound once for the whole batch
+            load_raw = self.load_raw
+            handle_request = self.handle_request
+            response: t.List[t.Any] = [load_raw(r, http_headers) for r in raw_request]
+            # Invalid requests are already resolved into responses on load,
+            # so only valid ones have to be dispatched
+            pending = [i for i, r in enumerate(response) if isinstance(r, Request)]
+            if len(pending) == 1:
+                i = pending[0]
+                response[i] = await handle_request(response[i])
+            elif pending:
+                results = await asyncio.gather(
+                    *[handle_request(response[i]) for i in pending]
+                )
+                for i, result in zip(pending, results):
+                    response[i] = result
         else:
             response = await self.handle_raw(raw_request, http_headers)  # type: ignore
 
         # Serialize response
         try:
-            return self.serializer.dumpb(response)
+            return serializer.dumpb(response)
         except (ValueError, TypeError):
             self.logger.exception("Unexpected exception")
-            return self.serializer.dumpb(Response(error=RPCInternalError()))
+            return self._internal_error_body
 
     async def handle_raw(
         self,
         raw_request: t.Dict[str, t.Any],
         http_headers: TransportInfo,
     ) -> Response:
+        request = self.load_raw(raw_request, http_headers)
+        if isinstance(request, Response):
+            return request
+        return await self.handle_request(request)
+
+    def load_raw(
+        self,
+        raw_request: t.Dict[str, t.Any],
+        http_headers: TransportInfo,
+    ) -> t.Union[Request, Response]:
         try:
-            request = Request.load(raw_request, transport_info=http_headers)
+            return Request.load(
+                raw_request,
+                transport_info=http_headers,
+                validate=False if self.trust_peers else None,
+            )
         except RPCInvalidRequest as e:
             request_id = (
                 raw_request["id"]
@@ -98,6 +193,8 @@ class HTTPRoutes(RouteTable):
                 else None
             )
             return Response(id=request_id, error=e)
+
+    async def handle_request(self, request: Request) -> Response:
         try:
             return await self.api.dispatch(request)
         except BaseError as e:
@@ -116,12 +213,23 @@ class Client:
     serializer: Serializer
     http_client: HTTPClient
 
+    # Batches with more requests are sent item by item using chunked
+    # transfer encoding, so that the whole body is never held in memory
+    stream_threshold: t.ClassVar[int] = 1000
+    # Requests are sent one by one
+    coalesce_window: float = 0
+
+    _ids: t.Iterator[int]
+
     def __init__(
         self, endpoint: str, serializer: Serializer, http_client: HTTPClient
     ) -> None:
         self.endpoint = endpoint
         self.serializer = serializer
         self.http_client = http_client
+        # Request IDs are sequential, random start keeps them distinct
+        # across clients
+        self._ids = count(randint(0, sys.maxsize // 2))
 
     def make_request(
         self,
@@ -130,51 +238,56 @@ class Client:
         params: t.Dict[str, t.Any] = None,
     ) -> t.Dict[str, t.Any]:
         return {
-            "id": randint(0, sys.maxsize),
+            "id": next(self._ids),
             "method": method,
-            "meta": meta or {},
-            "params": params or {},
+            "meta": meta if meta is not None else {},
+            "params": params if params is not None else {},
         }
 
     def make_response(self, response_body: bytes) -> t.Any:
         response_data = self.serializer.loadb(response_body)
+        # Hot names are bound locally, since batches are handled in a loop
+        dispatch = BaseExc.dispatch
         if isinstance(response_data, list):
-            result = []
+            result: t.List[t.Any] = []
+            append = result.append
+            warning_data: t.List[t.Dict[str, t.Any]] = []
             for resp in response_data:
-                for warning in resp["warnings"]:
-                    warnings.warn(
-                        t.cast(
-                            Warning,
-                            BaseExc.dispatch(
-                                warning["code"], warning["message"], **warning["data"]
-                            ),
-                        )
-                    )
+                warning_data.extend(resp["warnings"])
                 error = resp["error"]
                 if error is not None:
-                    result.append(
-                        BaseExc.dispatch(
-                            error["code"], error["message"], **error["data"]
-                        )
-                    )
+                    append(dispatch(error["code"], error["message"], **error["data"]))
                 else:
-                    result.append(resp["result"])
+                    append(resp["result"])
+            self.emit_warnings(warning_data)
             return result
         else:
-            for warning in response_data["warnings"]:
-                warnings.warn(
-                    t.cast(
-                        Warning,
-                        BaseExc.dispatch(
-                            warning["code"], warning["message"], **warning["data"]
-                        ),
-                    )
-                )
+            self.emit_warnings(response_data["warnings"])
             error = response_data["error"]
             if error is not None:
-                raise BaseExc.dispatch(error["code"], error["message"], **error["data"])
+                raise dispatch(error["code"], error["message"], **error["data"])
             return response_data["result"]
 
+    def emit_warnings(self, warning_data: t.List[t.Dict[str, t.Any]]) -> None:
+        # Each ``warnings.warn()`` call walks the filters, so duplicates,
+        # like deprecation of the same version within a batch, are emitted once
+        emitted: t.Set[t.Tuple[str, t.Optional[str], bytes]] = set()
+        dumpb = self.serializer.dumpb
+        for warning in warning_data:
+            # Data is not hashable, so it is keyed by its serialized form
+            key = (warning["code"], warning["message"], dumpb(warning["data"]))
+            if key in emitted:
+                continue
+            emitted.add(key)
+            warnings.warn(
+                t.cast(
+                    Warning,
+                    BaseExc.dispatch(
+                        warning["code"], warning["message"], **warning["data"]
+                    ),
+                )
+            )
+
     async def request(
         self,
         method: str,
@@ -189,8 +302,107 @@ class Client:
 
     async def batch(self, *request_data: t.Dict[str, t.Any]) -> t.List[t.Any]:
         request_data = [self.make_request(**r) for r in request_data]  # type: ignore
-        request_body = self.serializer.dumpb(request_data)
+        request_body: t.Union[bytes, t.AsyncIterator[bytes]]
+        if len(request_data) > self.stream_threshold:
+            request_body = self.stream_batch(request_data)
+        else:
+            request_body = self.serializer.dumpb(request_data)
         async with self.http_client.post(self.endpoint, data=request_body) as response:
             response.raise_for_status()
             response_body = await response.read()
             return self.make_response(response_body)
+
+    async def drain(self) -> None:
+        """Wait until all requests made by client are sent"""
+
+    async def stream_batch(
+        self, request_data: t.Sequence[t.Dict[str, t.Any]]
+    ) -> t.AsyncIterator[bytes]:
+        dumpb = self.serializer.dumpb
+        yield b"["
+        for i, request in enumerate(request_data):
+            yield b"," + dumpb(request) if i else dumpb(request)
+        yield b"]"
+
+
+class BatchingClient(Client):
+    """Client, which combines requests made within coalesce window into batches"""
+
+    # Requests are serialized when made, so that unserializable one
+    # fails on its caller instead of the whole batch
+    _pending: t.List[t.Tuple[bytes, asyncio.Future]]
+    _flush_handle: t.Optional[asyncio.TimerHandle]
+    _sending: t.Set[asyncio.Future]
+
+    loop: asyncio.AbstractEventLoop
+
+    def __init__(
+        self,
+        endpoint: str,
+        serializer: Serializer,
+        http_client: HTTPClient,
+        coalesce_window: float = 0.001,
+        *,
+        loop: asyncio.AbstractEventLoop = None,
+    ) -> None:
+        super().__init__(endpoint, serializer, http_client)
+        self.coalesce_window = coalesce_window
+        self.loop = loop if loop is not None else asyncio.get_event_loop()
+        self._pending = []
+        self._flush_handle = None
+        self._sending = set()
+
+    async def request(
+        self,
+        method: str,
+        meta: t.Dict[str, t.Any] = None,
+        **params,
+    ) -> t.Any:
+        request_body = self.serializer.dumpb(self.make_request(method, meta, params))
+        future = self.loop.create_future()
+        self._pending.append((request_body, future))
+        if self._flush_handle is None:
+            self._flush_handle = self.loop.call_later(self.coalesce_window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        task = asyncio.ensure_future(self.send_pending(pending), loop=self.loop)
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def drain(self) -> None:
+        """Send pending requests and wait until they are done"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self.flush()
+        if self._sending:
+            await asyncio.wait(self._sending)
+
+    async def send_pending(
+        self, pending: t.List[t.Tuple[bytes, asyncio.Future]]
+    ) -> None:
+        try:
+            request_body = b"[%s]" % b",".join(body for body, _ in pending)
+            async with self.http_client.post(
+                self.endpoint, data=request_body
+            ) as response:
+                response.raise_for_status()
+                # Server responds to batch items in the same order
+                results = self.make_response(await response.read())
+            if not isinstance(results, list) or len(results) != len(pending):
+                raise ValueError("Batch response does not match requests")
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(copy_exception(e))
+            return
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                # Request has been cancelled by caller
+                continue
+            if isinstance(result, BaseExc):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -6,19 +6,69 @@ from aioconductor import Component
 import rapidjson
 
 
+# Pair of typename and dumper function
+Dumper = t.Tuple[t.Optional[str], t.Callable]
+
+
 class Serializable(ABC):
+
+    __slots__ = ()
+
     @abstractmethod
     def dump(self) -> t.Any:
         """Dump object into serializable one"""
 
 
-class Serializer(Component):
+class Encoder(rapidjson.Encoder):
+    """JSON encoder, which dumps non-serializable objects by serializer"""
+
+    serializer: "Serializer"
+
+    def __new__(cls, serializer: "Serializer") -> "Encoder":
+        self = super().__new__(cls)
+        self.serializer = serializer
+        return self
+
+    def default(self, obj: t.Any) -> t.Any:
+        return self.serializer.before_dump(obj)
+
+
+class Decoder(rapidjson.Decoder):
+    """JSON decoder, which passes each decoded object to serializer"""
+
+    serializer: "Serializer"
 
-    _loads: t.ClassVar[t.Callable] = rapidjson.loads
-    _dumps: t.ClassVar[t.Callable] = rapidjson.dumps
+    def __new__(cls, serializer: "Serializer") -> "Decoder":
+        self = super().__new__(cls)
+        self.serializer = serializer
+        return self
+
+    def end_object(self, obj: t.Any) -> t.Any:
+        return self.serializer.after_load(obj)
+
+
+class Serializer(Component):
 
     loaders: t.ClassVar[t.Dict[str, t.Callable]] = {}
-    dumpers: t.ClassVar[t.Dict[t.Type, t.Callable]] = {}
+    dumpers: t.ClassVar[t.Dict[t.Type, Dumper]] = {}
+
+    # Dumpers resolved by exact type of object, kept per class,
+    # typename is ``None`` for ``Serializable`` objects
+    _dumper_cache: t.ClassVar[t.Dict[t.Type, Dumper]] = {}
+
+    # Encoder and decoder are reused, because rapidjson parses
+    # all keyword arguments of ``dumps()`` and ``loads()`` on each call,
+    # they are created on first use, so serializer works without setup
+    _encoder: t.Optional[Encoder] = None
+    _decoder: t.Optional[Decoder] = None
+
+    def __init_subclass__(cls, **kw) -> None:
+        super().__init_subclass__(**kw)  # type: ignore
+        cls._dumper_cache = {}
+
+    async def on_shutdown(self) -> None:
+        self._encoder = None
+        self._decoder = None
 
     @classmethod
     def add_loader(cls, name: str):
@@ -32,35 +82,66 @@ class Serializer(Component):
     def add_dumper(cls, type_: t.Type, typename: str):
         def decorator(func):
             cls.dumpers[type_] = (typename, func)
+            cls.clear_dumper_cache()
             return func
 
         return decorator
 
+    @classmethod
+    def clear_dumper_cache(cls) -> None:
+        # Subclasses may share dumpers of the class
+        cls._dumper_cache.clear()
+        for subclass in cls.__subclasses__():
+            subclass.clear_dumper_cache()
+
     def dumps(self, data: t.Any) -> str:
-        return self._dumps(data, default=self.before_dump)
+        if self._encoder is None:
+            self._encoder = Encoder(self)
+        return t.cast(str, self._encoder(data))
 
     def dumpb(self, data: t.Any) -> bytes:
-        return self._dumps(data, default=self.before_dump).encode("utf-8")
+        if self._encoder is None:
+            self._encoder = Encoder(self)
+        return t.cast(str, self._encoder(data)).encode("utf-8")
 
     def loads(self, data: str) -> t.Any:
-        return self._loads(data, object_hook=self.after_load)
+        if self._decoder is None:
+            self._decoder = Decoder(self)
+        return self._decoder(data)
 
     def loadb(self, data: bytes) -> t.Any:
-        return self._loads(data, object_hook=self.after_load)
+        if self._decoder is None:
+            self._decoder = Decoder(self)
+        return self._decoder(data)
 
     def before_dump(self, obj):
-        if isinstance(obj, Serializable):
-            return obj.dump()
-        for type_, (typename, dumper) in self.dumpers.items():
-            if isinstance(obj, type_):
-                return dict(dumper(obj), _type=typename)
-        raise TypeError(f"Type {type(obj)} is not JSON-serializable")
+        entry = self._dumper_cache.get(type(obj))
+        if entry is None:
+            entry = self._dumper_cache[type(obj)] = self.resolve_dumper(type(obj))
+        typename, dumper = entry
+        if typename is None:
+            return dumper(obj)
+        return dict(dumper(obj), _type=typename)
+
+    def resolve_dumper(self, type_: t.Type) -> Dumper:
+        if issubclass(type_, Serializable):
+            return None, type_.dump
+        entry = self.dumpers.get(type_)
+        if entry is not None:
+            return entry
+        for base, entry in self.dumpers.items():
+            if issubclass(type_, base):
+                return entry
+        raise TypeError(f"Type {type_} is not JSON-serializable")
 
     def after_load(self, obj):
-        try:
-            type_ = obj["_type"]
-            loader = self.loaders[type_]
-        except KeyError:
+        # Most of objects are untyped, so lookups are done without
+        # raising and catching ``KeyError`` on each of them
+        typename = obj.get("_type")
+        if typename is None:
+            return obj
+        loader = self.loaders.get(typename)
+        if loader is None:
             return obj
         del obj["_type"]
         return loader(**obj)
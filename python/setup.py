@@ -6,7 +6,6 @@ requirements = [
     "ConfigTree",
     "Python-RapidJSON",
     "ValidX",
-    "cached_property",
     "AIOHTTP",
 ]
 
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from aioconductor import Conductor, SimpleConfigPolicy
 from configtree import Tree
@@ -5,6 +7,15 @@ from configtree import Tree
 from myack import exc
 
 
+@pytest.fixture(scope="session")
+def event_loop():
+    # Single loop is shared by all tests, components are still set up
+    # and shut down by each test through ``conductor`` fixture
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
 @pytest.fixture
 def conductor(event_loop):
     async def sigleton(*components, config=None):
@@ -1,3 +1,4 @@
+from copy import deepcopy
 from datetime import date, timedelta
 
 import pytest
@@ -133,6 +134,17 @@ async def test_api(conductor):
     response = await app.dispatch(Request(id=1, method="foo.nested.get_nothing"))
     assert response.result is None
 
+    async def outer_middleware(handler, request):
+        response = await handler(request)
+        response.meta.setdefault("middlewares", []).append("outer_middleware")
+        return response
+
+    request = Request(id=1, method="foo.sum", params={"x": 1, "y": 2})
+    request.middlewares.append(outer_middleware)
+    response = await app.dispatch(request)
+    assert response.result == (3, 10)
+    assert response.meta["middlewares"][-1] == "outer_middleware"
+
     response = await app.dispatch(
         Request(
             id=1, method="foo.sum", params={"x": 1, "y": 2}, meta={"version": (1, 0)}
@@ -249,11 +261,15 @@ async def test_api(conductor):
         )
     assert info.value.data == {"version": (2, 1), "method": "foo.div"}
 
-    response = await app.dispatch(Request(id=1, method="list_versions"))
-    assert response.result == [
+    versions = [
         {"version": (1, 0), "description": "", "deprecated": True, "retire": retire},
         {"version": (2, 1), "description": "", "deprecated": False, "retire": None},
     ]
+    for _ in range(2):
+        response = await app.dispatch(Request(id=1, method="list_versions"))
+        assert response.result == versions
+        # Changes made to result do not affect following responses
+        response.result[0]["deprecated"] = False
 
     response = await app.dispatch(Request(id=1, method="list_exceptions"))
     assert response.result[0] == {
@@ -265,8 +281,18 @@ async def test_api(conductor):
         Request(id=1, method="list_exceptions", meta={"version": (2, 0)})
     )
     assert response20.result == response.result
+    response20.result[0]["code"] = "x"
+    assert response.result[0]["code"] == "error"
+
+    # Exceptions defined after setup are listed too
+    class Defined(BaseError, code="defined_after_setup"):
+        message = "Defined after setup"
+
+    response = await app.dispatch(Request(id=1, method="list_exceptions"))
+    assert Defined.code in [e["code"] for e in response.result]
 
     response = await app.dispatch(Request(id=1, method="list_methods"))
+    response_methods = deepcopy(response.result)
     assert response.result[0] == {
         "name": "foo.div",
         "raises": ["error.division_by_zero"],
@@ -286,6 +312,11 @@ async def test_api(conductor):
         "description": "List supported API versions",
     }
 
+    response.result[0]["schema"].clear()
+    response.result.pop()
+    response = await app.dispatch(Request(id=1, method="list_methods"))
+    assert response.result == response_methods
+
     response = await app.dispatch(
         Request(id=1, method="list_methods", meta={"version": (2, 0)})
     )
@@ -307,3 +338,39 @@ async def test_api(conductor):
         "builtin": True,
         "description": "List methods provided by API/Version",
     }
+
+
+@pytest.mark.asyncio
+async def test_api_version_dispatch(conductor):
+    dispatched = []
+
+    class V10(APIVersion, version=(1, 0)):
+        async def dispatch(self, request):
+            dispatched.append(request.method)
+            return await super().dispatch(request)
+
+        @handler
+        async def get_nothing(self):
+            return
+
+    class App(API):
+        v10: V10
+
+        @middleware(1)
+        async def middleware_1(self, handler, request):
+            response = await handler(request)
+            response.meta.setdefault("middlewares", []).append("App.middleware_1")
+            return response
+
+    app = await conductor(App)
+
+    # Overridden dispatch of version is not bypassed
+    response = await app.dispatch(
+        Request(id=1, method="get_nothing", meta={"version": (1, 0)})
+    )
+    assert response.result is None
+    assert response.meta == {"version": (1, 0), "middlewares": ["App.middleware_1"]}
+
+    with pytest.raises(RPCUndefinedMethod):
+        await app.dispatch(Request(id=1, method="undefined", meta={"version": (1, 0)}))
+    assert dispatched == ["get_nothing", "undefined"]
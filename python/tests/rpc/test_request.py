@@ -42,6 +42,63 @@ def test_load():
         Request.load({"id": None, "method": "foo"})
     assert info.value.data == {"reason": {"id": "Value should not be null."}}
 
+    request = Request.load({"id": 1, "method": b"foo"})
+    assert request.method == "foo"
+
+    request = Request.load(
+        {"id": 1, "method": " foo ", "meta": {" x ": "y"}, "params": {" a ": "b"}}
+    )
+    assert request.method == "foo"
+    assert request.meta == {"x": "y"}
+    assert request.params == {"a": "b"}
+
+    with pytest.raises(RPCInvalidRequest) as info:
+        Request.load({"id": True, "method": "foo"})
+    assert list(info.value.data["reason"]) == ["id"]
+
+    with pytest.raises(RPCInvalidRequest) as info:
+        Request.load({"id": 1, "method": "foo", "params": None})
+    assert info.value.data == {"reason": {"params": "Value should not be null."}}
+
+    with pytest.raises(RPCInvalidRequest) as info:
+        Request.load({"id": 1, "method": "foo", "params": {1: "x"}})
+    assert list(info.value.data["reason"]) == ["params.1.@KEY"]
+
+    with pytest.raises(RPCInvalidRequest) as info:
+        Request.load({"id": 1, "method": "foo", "extra": "x"})
+    assert list(info.value.data["reason"]) == ["extra"]
+
+
+def test_load_trusted():
+    payload = {"id": 1, "method": "foo", "meta": {"version": [1, 0]}, "x": "y"}
+    request = Request.load(payload, validate=False)
+    assert request.id == 1
+    assert request.method == "foo"
+    assert request.meta == {"version": (1, 0)}
+    assert request.params == {}
+
+    # Requests without ID or method are still validated
+    with pytest.raises(RPCInvalidRequest) as info:
+        Request.load({"method": "foo"}, validate=False)
+    assert list(info.value.data["reason"]) == ["id"]
+
+    # So are requests of unexpected shape
+    with pytest.raises(RPCInvalidRequest):
+        Request.load([], validate=False)
+
+    with pytest.raises(RPCInvalidRequest) as info:
+        Request.load({"id": 1, "method": "foo", "meta": []}, validate=False)
+    assert list(info.value.data["reason"]) == ["meta"]
+
+    with pytest.raises(RPCInvalidRequest) as info:
+        Request.load({"id": 1, "method": "foo", "params": []}, validate=False)
+    assert list(info.value.data["reason"]) == ["params"]
+
+    with pytest.raises(RPCInvalidRequest) as info:
+        payload = {"id": 1, "method": "foo", "meta": {"version": 1}}
+        Request.load(payload, validate=False)
+    assert list(info.value.data["reason"]) == ["meta.version"]
+
 
 def test_handler():
     async def foo(x: int, y: int):
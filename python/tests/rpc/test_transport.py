@@ -18,14 +18,15 @@ from myack.rpc.exc import (
 from myack.exc import BaseExc
 
 
+@pytest.mark.parametrize("trust_peers", [False, True])
 @pytest.mark.asyncio
-async def test_routes(conductor, unused_tcp_port):
+async def test_routes(conductor, unused_tcp_port, mocker, trust_peers):
     class TestAPI(API):
         @handler(schema=validx.Dict({"x": validx.Int(), "y": validx.Int()}))
         async def sum(self, x, y):
             return x + y
 
-    class RPCRoutes(HTTPRoutes, api=TestAPI, prefix="/rpc"):
+    class RPCRoutes(HTTPRoutes, api=TestAPI, prefix="/rpc", trust_peers=trust_peers):
         pass
 
     class App(Server):
@@ -43,9 +44,92 @@ async def test_routes(conductor, unused_tcp_port):
         {"method": "sum", "params": {"x": 3, "y": 4}},
     ) == [3, 7]
 
+    # Malformed request fails on its own, even if peers are trusted
+    results = await client.batch(
+        {"method": "sum", "params": {"x": 1, "y": 2}},
+        {"method": "sum", "meta": [], "params": {"x": 3, "y": 4}},
+    )
+    assert results[0] == 3
+    assert isinstance(results[1], RPCInvalidRequest)
+
+    client.stream_threshold = 1
+    assert await client.batch(
+        {"method": "sum", "params": {"x": 1, "y": 2}},
+        {"method": "sum", "params": {"x": 3, "y": 4}},
+    ) == [3, 7]
+
     async with http_client.get("/rpc/healthcheck") as response:
         assert response.status == 204
 
+    first, second = client.make_request("sum"), client.make_request("sum")
+    assert second["id"] == first["id"] + 1
+
+    # Concurrent requests are sent within a single batch
+    client = app.rpc.get_client(http_client, coalesce_window=0.01)
+    assert app.rpc.get_client(http_client, coalesce_window=0.01) is client
+    post = mocker.spy(http_client, "post")
+    results = await asyncio.gather(
+        client.request("sum", x=1, y=2),
+        client.request("sum", x=3, y=4),
+        client.request("undefined"),
+        return_exceptions=True,
+    )
+    assert results[:2] == [3, 7]
+    assert isinstance(results[2], RPCUndefinedMethod)
+    assert post.call_count == 1
+
+    # Unserializable request fails on its caller only
+    results = await asyncio.gather(
+        client.request("sum", x=1, y=2),
+        client.request("sum", x=object(), y=4),
+        return_exceptions=True,
+    )
+    assert results[0] == 3
+    assert isinstance(results[1], TypeError)
+
+    # Pending requests are sent on drain without waiting for coalesce window
+    client = app.rpc.get_client(http_client, coalesce_window=60)
+    task = asyncio.ensure_future(client.request("sum", x=1, y=2))
+    await asyncio.sleep(0)
+    await client.drain()
+    assert await asyncio.wait_for(task, 1) == 3
+
+    # So are pending requests of replaced client, shutdown waits for them
+    task = asyncio.ensure_future(client.request("sum", x=1, y=2))
+    await asyncio.sleep(0)
+    client = app.rpc.get_client(http_client, coalesce_window=0.01)
+    await app.rpc.on_shutdown()
+    assert task.done()
+    assert await task == 3
+    await app.rpc.on_setup()
+    client = app.rpc.get_client(http_client, coalesce_window=0.01)
+
+    # Batch response, which does not match requests, fails each of them
+    client.make_response = lambda response_body: [3]
+    results = await asyncio.gather(
+        client.request("sum", x=1, y=2),
+        client.request("sum", x=3, y=4),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert results[0] is not results[1]
+    del client.make_response
+
+    # Cancelled request does not affect others within the batch
+    task = asyncio.ensure_future(client.request("sum", x=1, y=2))
+    await asyncio.sleep(0)
+    task.cancel()
+    assert await client.request("sum", x=3, y=4) == 7
+
+    # Transport errors are propagated to each request
+    await http_client.close()
+    results = await asyncio.gather(
+        client.request("sum", x=1, y=2),
+        client.request("sum", x=3, y=4),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
 
 @pytest.mark.asyncio
 async def test_disconnection(conductor, unused_tcp_port):
@@ -79,6 +163,11 @@ async def test_disconnection(conductor, unused_tcp_port):
     with pytest.raises(aiohttp.client_exceptions.ServerDisconnectedError):
         await task
 
+    # Closed client is replaced by a new one
+    assert app.get_client() is not client.http_client
+    assert app.rpc.get_client(app.get_client()) is not client
+    assert app.get_client() is app.get_client()
+
 
 @pytest.mark.asyncio
 async def test_errors(conductor, unused_tcp_port):
@@ -112,6 +201,9 @@ async def test_errors(conductor, unused_tcp_port):
     assert isinstance(result[0], RPCUndefinedMethod)
     assert result[1] == 3
 
+    result = await client.batch({"method": "sum", "params": {"x": 1, "y": 2}})
+    assert result == [3]
+
     with pytest.raises(RPCInternalError):
         await client.request("unserializable")
 
@@ -124,6 +216,14 @@ async def test_errors(conductor, unused_tcp_port):
         assert isinstance(exc, RPCParseError)
         assert exc.data["reason"] == "Parse error at offset 0: Invalid value."
 
+    # Parse error responses are cached by reason
+    app.rpc._parse_error_bodies_limit = 1
+    for data in (b"invalid_json", b"invalid_json", b"{"):
+        async with client.http_client.post(client.endpoint, data=data) as response:
+            error = client.serializer.loadb(await response.read())["error"]
+            assert error["code"] == RPCParseError.code
+    assert list(app.rpc._parse_error_bodies) == [error["data"]["reason"]]
+
     request_body = client.serializer.dumpb(
         {"method": "div", "params": {"x": 4, "y": 2}}
     )
@@ -134,6 +234,14 @@ async def test_errors(conductor, unused_tcp_port):
         assert isinstance(exc, RPCInvalidRequest)
         assert exc.data["reason"]["id"] == "Required key is not provided."
 
+    request_body = client.serializer.dumpb(
+        [{"method": "div"}, client.make_request("sum", params={"x": 1, "y": 2})]
+    )
+    async with client.http_client.post(client.endpoint, data=request_body) as response:
+        response = client.serializer.loadb(await response.read())
+        assert response[0]["error"]["code"] == RPCInvalidRequest.code
+        assert response[1]["result"] == 3
+
 
 @pytest.mark.parametrize("retire", [None, date.today() + timedelta(days=30)])
 @pytest.mark.asyncio
@@ -167,6 +275,6 @@ async def test_warnings(conductor, unused_tcp_port, retire):
             {"method": "sum", "meta": {"version": [1, 0]}, "params": {"x": 1, "y": 2}},
             {"method": "sum", "meta": {"version": [1, 0]}, "params": {"x": 3, "y": 5}},
         ) == [3, 8]
-    assert len(info) == 2
+    # Duplicate warnings of batch are emitted once
+    assert len(info) == 1
     assert info[0].message == RPCDeprecatedVersion(retire=retire)
-    assert info[1].message == RPCDeprecatedVersion(retire=retire)
@@ -1,3 +1,5 @@
+import pytest
+
 from myack import exc
 
 
@@ -60,3 +62,21 @@ def test_exc():
 
     assert TestError(foo="bar") == TestError(foo="bar")
     assert TestError(foo="bar") != TestError(bar="baz")
+    assert len({TestError(foo="bar"), TestError(foo="bar"), TestError(x=[1])}) == 2
+
+
+def test_exc_invalid():
+    class TestError(exc.BaseError, code="test"):
+        pass
+
+    with pytest.raises(TypeError) as info:
+
+        class ConflictingTestError(exc.BaseError, code="test"):
+            pass
+
+    assert info.value.args[0].startswith("Code 'error.test' of ")
+
+    with pytest.raises(TypeError) as info:
+        TestError()
+    assert info.value.args == ("Empty exception message",)
+    assert TestError("Test error").message == "Test error"
@@ -1,10 +1,12 @@
+from concurrent import futures
+
 import pytest
 
-from myack.executors import IOExecutor, CPUExecutor
+from myack.executors import Executor, IOExecutor, CPUExecutor
 
 
-def fact(n: int) -> int:
-    result = 1
+def fact(n: int, start: int = 1) -> int:
+    result = start
     for i in range(2, n + 1):
         result *= i
     return result
@@ -12,7 +14,21 @@ def fact(n: int) -> int:
 
 @pytest.mark.asyncio
 async def test_executors(conductor):
-    io, cpu = await conductor(IOExecutor, CPUExecutor)
+    io, cpu = await conductor(
+        IOExecutor, CPUExecutor, config={"executors.cpu.max_workers": 2}
+    )
+    assert cpu.instance._max_workers == 2
 
     assert await io.run(fact, 10) == 3628800
     assert await cpu.run(fact, 10) == 3628800
+    assert await io.run(fact, 10, start=2) == 7257600
+    assert await cpu.run(fact, 10, start=2) == 7257600
+
+
+@pytest.mark.asyncio
+async def test_custom_executor(conductor):
+    class CustomExecutor(Executor):
+        executor_class = futures.ThreadPoolExecutor
+
+    executor = await conductor(CustomExecutor)
+    assert await executor.run(fact, 10) == 3628800
@@ -1,7 +1,7 @@
 import pytest
 from aiohttp.web import Response, WebSocketResponse, WSMsgType
 
-from myack.http import Server, Application, RouteTable, route, middleware
+from myack.http import Server, Application, RouteTable, Client, route, middleware
 
 
 @pytest.mark.asyncio
@@ -74,6 +74,9 @@ async def test_http(conductor, unused_tcp_port):
     async with client.get(f"{url}/foo") as response:
         assert await response.text() == "RootApp.foo + RootApp.baz + RootApp.bar"
 
+    async with client.get("/foo?x=y") as response:
+        assert await response.text() == "RootApp.foo + RootApp.baz + RootApp.bar"
+
     async with client.get("/app/foo") as response:
         assert await response.text() == (
             "NestedApp.foo + NestedApp.baz + NestedApp.bar + "
@@ -97,3 +100,11 @@ async def test_http(conductor, unused_tcp_port):
         msg = await ws.receive_str()
         assert msg == "pong"
         await ws.send_str("close")
+
+
+@pytest.mark.asyncio
+async def test_client_app_url(event_loop):
+    async with Client("::1", 8080, loop=event_loop) as client:
+        assert client.app_url("/foo?x=y") == "http://[::1]:8080/foo?x=y"
+        assert client.app_url("foo?x=y") == "http://[::1]:8080/foo?x=y"
+        assert client.app_url("http://localhost/foo") == "http://localhost/foo"
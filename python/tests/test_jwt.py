@@ -1,48 +1,91 @@
 import hmac
-import binascii
+from functools import lru_cache
 
 import pytest
+from aioconductor import Conductor, SimpleConfigPolicy
 from configtree import Tree
 
 from myack.jwt import JWT, JWTInvalid, JWTExpired, b64encode, b64decode
 
 
-@pytest.fixture(
-    params=[
-        {
-            "alg": "HS256",
-            "key": "c74c46a37f7523e8c8d7a5fbf03125daf7075a3d93a5a02a5b4f92b01916cb72",
-        },
-        {
-            "alg": "HS384",
-            "key": (
-                "23a4448121b6db152bc844a4302e4230"
-                "aabdfdac0f81e7a3984f4e97bbe39b0f"
-                "658f577c54059f2cfec848f20cc6c4f1"
-            ),
-        },
-        {
-            "alg": "HS512",
-            "key": (
-                "93f8a1d030d26bdd5044dc294534b8f6"
-                "5285bf267e8daee7b5e3383d2cabda19"
-                "636816b6afe046a47aeb94712bc372b4"
-                "805de92fbe6f168face8773e6e23cd13"
-            ),
-        },
-    ]
-)
+# Error data expected from encoder "test"
+_ERR_DATA = {"sub": "test"}
+
+
+@lru_cache(maxsize=None)
+def _hmac(key, algorithm):
+    return hmac.new(key, digestmod=algorithm)
+
+
+def hmac_digest(key, msg, algorithm):
+    # HMAC keyed once is copied, instead of deriving pads on each call
+    h = _hmac(key, algorithm).copy()
+    h.update(msg)
+    return h.digest()
+
+
+def sign_token(jwt, header, payload):
+    # Signing input is joined once and reused as prefix of the token
+    signing_input = b".".join((header, payload))
+    signature = hmac_digest(
+        jwt.encoders["test"].key,
+        signing_input,
+        jwt.encoders["test"].algorithm,
+    )
+    return b".".join((signing_input, b64encode(signature)))
+
+
+CONFIGS = [
+    {
+        "alg": "HS256",
+        "key": "c74c46a37f7523e8c8d7a5fbf03125daf7075a3d93a5a02a5b4f92b01916cb72",
+    },
+    {
+        "alg": "HS384",
+        "key": (
+            "23a4448121b6db152bc844a4302e4230"
+            "aabdfdac0f81e7a3984f4e97bbe39b0f"
+            "658f577c54059f2cfec848f20cc6c4f1"
+        ),
+    },
+    {
+        "alg": "HS512",
+        "key": (
+            "93f8a1d030d26bdd5044dc294534b8f6"
+            "5285bf267e8daee7b5e3383d2cabda19"
+            "636816b6afe046a47aeb94712bc372b4"
+            "805de92fbe6f168face8773e6e23cd13"
+        ),
+    },
+]
+
+
+@pytest.fixture(params=CONFIGS)
 def config(request):
     result = Tree()
     result.branch("jwt.test").update(request.param)
     return result
 
 
+@pytest.fixture(scope="module", params=CONFIGS)
+def shared_jwt(request, event_loop):
+    # JWT is set up once for tests, which do not change its config
+    config = Tree()
+    config.branch("jwt.test").update(request.param)
+    conductor = Conductor(config_policy=SimpleConfigPolicy(config), loop=event_loop)
+    jwt = conductor.add(JWT)
+    event_loop.run_until_complete(conductor.setup())
+    yield jwt
+    event_loop.run_until_complete(conductor.shutdown())
+
+
 @pytest.mark.asyncio
 async def test_jwt(conductor, config):
     jwt = await conductor(JWT, config=config)
     assert "test" in jwt.encoders
     assert repr(jwt.encoders["test"]) == f"<{config['jwt.test.alg']}(test)>"
+    # Key is parsed once by encoder, tests use its bytes directly
+    assert jwt.encoders["test"].key == bytes.fromhex(config["jwt.test.key"])
 
     now = jwt.timer.tsnow()
     original_payload = {"foo": "bar"}
@@ -60,28 +103,97 @@ async def test_jwt(conductor, config):
     header = jwt.serializer.loadb(b64decode(header))
     payload = jwt.serializer.loadb(b64decode(payload))
     signature = b64decode(signature)
-    effective_signature = hmac.new(
-        binascii.unhexlify(config["jwt.test.key"]),
+    effective_signature = hmac_digest(
+        jwt.encoders["test"].key,
         signing_input,
         jwt.encoders["test"].algorithm,
-    ).digest()
+    )
 
     assert header == {"typ": "JWT", "alg": config["jwt.test.alg"]}
     assert payload["foo"] == "bar"
     assert now <= payload["iat"] < now + 0.001
     assert signature == effective_signature
 
-    invalid_signature = hmac.new(
-        binascii.unhexlify(config["jwt.test.key"]) + b"xxx",
+    invalid_signature = hmac_digest(
+        jwt.encoders["test"].key + b"xxx",
         signing_input,
         jwt.encoders["test"].algorithm,
-    ).digest()
+    )
     invalid_token = b".".join((signing_input, b64encode(invalid_signature)))
 
     with pytest.raises(JWTInvalid) as info:
         jwt.decode("test", invalid_token)
     assert info.value.message == "Invalid JWT"
-    assert info.value.data == {"sub": "test"}
+    assert info.value.data == _ERR_DATA
+
+    with pytest.raises(JWTInvalid) as info:
+        jwt.decode("test", "ünicode")
+    assert info.value.data == _ERR_DATA
+
+
+@pytest.mark.asyncio
+async def test_jwt_verified_cache(conductor, config):
+    jwt = await conductor(JWT, config=config)
+    encoder = jwt.encoders["test"]
+    encoder._verified_limit = 2
+
+    token = jwt.encode("test", {"foo": "bar", "roles": ["user"]})
+    payload = jwt.decode("test", token)
+    payload["foo"] = "baz"  # Cached payload is not affected
+    payload["roles"].append("admin")
+    payload = jwt.decode("test", token)
+    assert payload["foo"] == "bar"
+    assert payload["roles"] == ["user"]
+    assert list(encoder._verified) == [token]
+
+    tokens = [jwt.encode("test", {"foo": i}) for i in range(2)]
+    for token in tokens:
+        jwt.decode("test", token)
+    assert list(encoder._verified) == tokens[-1:]
+
+
+@pytest.mark.asyncio
+async def test_jwt_short_key(conductor, config):
+    keylen = len(config["jwt.test.key"]) // 2
+    config["jwt.test"].update(key=config["jwt.test.key"][:-2])
+
+    with pytest.raises(ValueError) as info:
+        await conductor(JWT, config=config)
+    assert info.value.args == (
+        f"Key of <{config['jwt.test.alg']}(test)> should be at least {keylen} bytes",
+    )
+
+
+@pytest.mark.asyncio
+async def test_jwt_header(conductor, config):
+    jwt = await conductor(JWT, config=config)
+
+    token = jwt.encode("test", {"foo": "bar"}, {"kid": "x", "alg": "none"})
+    payload = jwt.decode("test", token)
+    assert payload["foo"] == "bar"
+
+    header = jwt.serializer.loadb(b64decode(token.split(b".")[0]))
+    assert header == {"typ": "JWT", "alg": config["jwt.test.alg"], "kid": "x"}
+
+
+@pytest.mark.asyncio
+async def test_jwt_long_key(conductor, config):
+    # Key longer than hash block size
+    config["jwt.test"].update(key=config["jwt.test.key"] * 3)
+
+    jwt = await conductor(JWT, config=config)
+
+    token = jwt.encode("test", {"foo": "bar"})
+    payload = jwt.decode("test", token)
+    assert payload["foo"] == "bar"
+
+    signing_input, signature = token.rsplit(b".", 1)
+    effective_signature = hmac_digest(
+        jwt.encoders["test"].key,
+        signing_input,
+        jwt.encoders["test"].algorithm,
+    )
+    assert b64decode(signature) == effective_signature
 
 
 @pytest.mark.asyncio
@@ -106,7 +218,7 @@ async def test_jwt_ttl(conductor, config, ttl):
         with pytest.raises(JWTExpired) as info:
             jwt.decode("test", token)
         assert info.value.message == "Expired JWT"
-        assert info.value.data == {"sub": "test"}
+        assert info.value.data == _ERR_DATA
     else:
         payload = jwt.decode("test", token)
         assert payload["foo"] == "bar"
@@ -144,14 +256,7 @@ async def test_jwt_max_ttl(conductor, config, max_ttl):
     payload = jwt.serializer.loadb(b64decode(payload))
     payload["exp"] += 20
     payload = b64encode(jwt.serializer.dumpb(payload))
-    signature = b64encode(
-        hmac.new(
-            binascii.unhexlify(config["jwt.test.key"]),
-            b".".join((header, payload)),
-            jwt.encoders["test"].algorithm,
-        ).digest()
-    )
-    token = b".".join((header, payload, signature))
+    token = sign_token(jwt, header, payload)
 
     if max_ttl:
         payload = jwt.decode("test", token)
@@ -161,25 +266,18 @@ async def test_jwt_max_ttl(conductor, config, max_ttl):
         with pytest.raises(JWTInvalid) as info:
             jwt.decode("test", token)
         assert info.value.message == "Invalid JWT"
-        assert info.value.data == {"sub": "test"}
+        assert info.value.data == _ERR_DATA
 
     header, payload, _ = token.split(b".")
     payload = jwt.serializer.loadb(b64decode(payload))
     payload["exp"] += 20
     payload = b64encode(jwt.serializer.dumpb(payload))
-    signature = b64encode(
-        hmac.new(
-            binascii.unhexlify(config["jwt.test.key"]),
-            b".".join((header, payload)),
-            jwt.encoders["test"].algorithm,
-        ).digest()
-    )
-    token = b".".join((header, payload, signature))
+    token = sign_token(jwt, header, payload)
 
     with pytest.raises(JWTInvalid) as info:
         jwt.decode("test", token)
     assert info.value.message == "Invalid JWT"
-    assert info.value.data == {"sub": "test"}
+    assert info.value.data == _ERR_DATA
 
 
 @pytest.mark.asyncio
@@ -196,49 +294,68 @@ async def test_jwt_rot(conductor, config, rot_period, rot_salt):
 
     signing_input, signature = token.rsplit(b".", 1)
     signature = b64decode(signature)
-    effective_signature = hmac.new(
-        binascii.unhexlify(config["jwt.test.key"]),
+    effective_signature = hmac_digest(
+        jwt.encoders["test"].key,
         signing_input,
         jwt.encoders["test"].algorithm,
-    ).digest()
+    )
 
     if rot_period:
         assert signature != effective_signature
     else:
         assert signature == effective_signature
 
+    payload = jwt.serializer.loadb(b64decode(signing_input.split(b".")[1]))
+    effective_signature = hmac_digest(
+        jwt.encoders["test"].get_effective_key(payload["iat"]),
+        signing_input,
+        jwt.encoders["test"].algorithm,
+    )
+    assert signature == effective_signature
+
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    "header",
-    [
-        b"&invalid_base64",
-        b64encode(b"Invalid JSON"),
-        b64encode(b"null"),
-        b64encode(b"{}"),
-    ],
-)
-@pytest.mark.parametrize(
-    "payload",
-    [
-        b"&invalid_base64",
-        b64encode(b"Invalid JSON"),
-        b64encode(b"null"),
-        b64encode(b"{}"),
-    ],
-)
-async def test_jwt_invalid(conductor, config, header, payload):
+async def test_jwt_rot_key(conductor):
+    # Rotated key must not change between releases,
+    # otherwise issued tokens would stop being valid
+    config = Tree()
+    config.branch("jwt.test").update(
+        alg="HS256",
+        key="c74c46a37f7523e8c8d7a5fbf03125daf7075a3d93a5a02a5b4f92b01916cb72",
+        rot_salt=1,
+        rot_period=60,
+    )
+
     jwt = await conductor(JWT, config=config)
 
-    signature = b64encode(
-        hmac.new(
-            binascii.unhexlify(config["jwt.test.key"]),
-            b".".join((header, payload)),
-            jwt.encoders["test"].algorithm,
-        ).digest()
+    assert jwt.encoders["test"].get_effective_key(1577836800) == bytes.fromhex(
+        "ac5730b7e0bd8b0883e08a1d05657fb6d1931a164d9fc1038dc181c1d09fd022"
     )
-    token = b".".join((header, payload, signature))
+
+
+INVALID_SEGMENTS = [
+    b"&invalid_base64",
+    b64encode(b"Invalid JSON"),
+    b64encode(b"null"),
+    b64encode(b"{}"),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("header", INVALID_SEGMENTS)
+@pytest.mark.parametrize("payload", INVALID_SEGMENTS)
+async def test_jwt_invalid(shared_jwt, header, payload):
+    token = sign_token(shared_jwt, header, payload)
     with pytest.raises(JWTInvalid) as info:
-        jwt.decode("test", token)
+        shared_jwt.decode("test", token)
     assert info.value.message == "Invalid JWT"
-    assert info.value.data == {"sub": "test"}
+    assert info.value.data == _ERR_DATA
+
+
+@pytest.mark.asyncio
+async def test_jwt_invalid_segments(shared_jwt):
+    token = shared_jwt.encode("test", {"foo": "bar"})
+    for invalid_token in (token.replace(b".", b""), token + b".", b"." + token):
+        with pytest.raises(JWTInvalid) as info:
+            shared_jwt.decode("test", invalid_token)
+        assert info.value.data == _ERR_DATA
@@ -6,6 +6,24 @@ from pytz import UTC, timezone
 from myack.serializer import Serializable, Serializer
 
 
+# Datetimes are pinned, it is serializer that is tested, not the clock
+TZ_CASES = [
+    (tz, UTC.localize(datetime(2020, 1, 1, 12)).astimezone(tz))
+    for tz in (timezone("Asia/Tokyo"), timezone("US/Eastern"), UTC)
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tz,dt", TZ_CASES, ids=[tz.zone for tz, _ in TZ_CASES])
+async def test_serializer_tz(conductor, tz, dt):
+    serializer = await conductor(Serializer)
+
+    assert dt.tzinfo.zone == tz.zone
+    res = serializer.loads(serializer.dumps(dt))
+    assert res == dt
+    assert res.utcoffset().total_seconds() == 0
+
+
 @pytest.mark.asyncio
 async def test_serializer(conductor):
     class Foo(Serializable):
@@ -15,6 +33,7 @@ async def test_serializer(conductor):
     serializer = await conductor(Serializer)
 
     assert serializer.loads('{"x": 1}') == {"x": 1}
+    assert serializer.loads('{"_type": "x"}') == {"_type": "x"}
     assert serializer.dumps({"x": 1}) == '{"x":1}'
     assert serializer.dumps(Foo()) == '{"foo":"bar"}'
 
@@ -30,17 +49,18 @@ async def test_serializer(conductor):
         serializer.dumpb(object())
     assert info.value.args == (f"Type {object} is not JSON-serializable",)
 
-    for tz in (timezone("Asia/Tokyo"), timezone("US/Eastern"), UTC):
-        dt = datetime.now(tz=UTC).astimezone(tz)
-        res = serializer.loads(serializer.dumps(dt))
-        assert res == dt
-        assert res.utcoffset().total_seconds() == 0
-
     dt = datetime.now()
     res = serializer.loads(serializer.dumps(dt))
     assert res == dt
     assert res.utcoffset() is None
 
+    class DateTime(datetime):
+        pass
+
+    dt = DateTime.now()
+    for _ in range(2):
+        assert dt == serializer.loads(serializer.dumps(dt))
+
     d = date.today()
     assert d == serializer.loads(serializer.dumps(d))
 
@@ -52,3 +72,44 @@ async def test_serializer(conductor):
 
     set_ = {1, 2, 3}
     assert set_ == serializer.loads(serializer.dumps(set_))
+
+    # Serializer is usable without being set up, e.g. after shutdown
+    await serializer.on_shutdown()
+    assert set_ == serializer.loadb(serializer.dumpb(set_))
+
+
+@pytest.mark.asyncio
+async def test_serializer_subclass(conductor):
+    class OwnSerializer(Serializer):
+        dumpers = {}
+
+    @OwnSerializer.add_dumper(date, "date")
+    def dump_date(d):
+        return {"iso": d.isoformat()}
+
+    class SharedSerializer(Serializer):
+        pass
+
+    class OwnSharedSerializer(OwnSerializer):
+        pass
+
+    d = date(2020, 1, 1)
+    serializers = await conductor(
+        Serializer, OwnSerializer, SharedSerializer, OwnSharedSerializer
+    )
+
+    # Dumpers resolved by one serializer do not leak into another one
+    for _ in range(2):
+        assert [serializer.dumps(d) for serializer in serializers] == [
+            '{"year":2020,"month":1,"day":1,"_type":"date"}',
+            '{"iso":"2020-01-01","_type":"date"}',
+            '{"year":2020,"month":1,"day":1,"_type":"date"}',
+            '{"iso":"2020-01-01","_type":"date"}',
+        ]
+
+    # Dumpers added to class are seen by subclasses, which share them
+    @OwnSerializer.add_dumper(date, "day")
+    def dump_day(d):
+        return {"ordinal": d.toordinal()}
+
+    assert serializers[-1].dumps(d) == '{"ordinal":737425,"_type":"day"}'
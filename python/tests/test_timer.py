@@ -1,4 +1,3 @@
-from time import time
 from datetime import datetime, timedelta
 
 import pytest
@@ -8,54 +7,55 @@ from myack.timer import Timer
 
 
 @pytest.mark.asyncio
-async def test_timer(conductor):
+async def test_timer(conductor, mocker):
     timer = await conductor(Timer)
 
-    def cmpts(left, right):
-        return left <= right <= left + 0.001
-
-    def cmpdt(left, right):
-        return left <= right <= left + timedelta(milliseconds=1)
+    # Clock is frozen, so that results are compared exactly,
+    # the value is chosen to be exact in floating point arithmetic
+    now = 1577836800.25
+    clock = mocker.patch("myack.timer.time", return_value=now)
 
     assert not timer.shifted
-
-    dtnow = datetime.now(UTC)
-    tsnow = time()
-    assert cmpdt(dtnow, timer.dtnow())
-    assert cmpts(tsnow, timer.tsnow())
+    assert timer.dtnow() == datetime.fromtimestamp(now, tz=UTC)
+    assert timer.tsnow() == now
 
     timer.goto(2019, 1, 8, 19, 35)
     assert timer.shifted
 
     dtnow = datetime(2019, 1, 8, 19, 35, tzinfo=UTC)
     tsnow = dtnow.timestamp()
-    assert cmpdt(dtnow, timer.dtnow())
-    assert cmpts(tsnow, timer.tsnow())
+    assert timer.dtnow() == dtnow
+    assert timer.tsnow() == tsnow
+
+    clock.return_value = now + 1
+    assert timer.dtnow() == dtnow + timedelta(seconds=1)
+    assert timer.tsnow() == tsnow + 1
+    clock.return_value = now
 
     timer.reset()
     assert not timer.shifted
-    assert not cmpdt(dtnow, timer.dtnow())
-    assert not cmpts(tsnow, timer.tsnow())
+    assert timer.dtnow() != dtnow
+    assert timer.tsnow() == now
 
     dtnow = datetime(2019, 1, 8, 19, 35, tzinfo=UTC).astimezone(timezone("US/Eastern"))
     tsnow = dtnow.timestamp()
     timer.goto(dt=dtnow)
     assert timer.shifted
-    assert cmpdt(dtnow, timer.dtnow())
-    assert cmpts(tsnow, timer.tsnow())
+    assert timer.dtnow() == dtnow
+    assert timer.tsnow() == tsnow
 
     timer.reset()
     timer.shift(timedelta(minutes=5))
     assert timer.shifted
 
-    dtnow = datetime.now(UTC) + timedelta(minutes=5)
-    tsnow = dtnow.timestamp()
-    assert cmpdt(dtnow, timer.dtnow())
-    assert cmpts(tsnow, timer.tsnow())
+    dtnow = datetime.fromtimestamp(now, tz=UTC) + timedelta(minutes=5)
+    tsnow = now + 5 * 60
+    assert timer.dtnow() == dtnow
+    assert timer.tsnow() == tsnow
 
     timer.shift(minutes=-10)
 
     dtnow += timedelta(minutes=-10)
     tsnow -= 10 * 60
-    assert cmpdt(dtnow, timer.dtnow())
-    assert cmpts(tsnow, timer.tsnow())
+    assert timer.dtnow() == dtnow
+    assert timer.tsnow() == tsnow